@@ -0,0 +1,168 @@
+import argparse
+import json
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from pymodbus.client import ModbusTcpClient
+from pymodbus.exceptions import ModbusException
+from typing import Dict, List, Tuple
+
+from saj_profile import BLOCKS, parse_inverter, profile_reads, read_block
+
+# Constants
+SLAVE_ID = 1
+ADDRESS, COUNT = BLOCKS["settings"]
+
+# Settings by name: offset in the 0x1008 block and scale, as in read_inverter_settings.py
+SETTINGS_REGISTERS = {
+    "SafetyType": (0, 1),
+    "FunMask": (1, 1),
+    "ISOLimit": (11, 1),
+    "PowerLimited": (20, 0.001),  # 0x101C, see set_inverter_limit.py
+    "ReactiveMode": (21, 1),
+    "ReactiveValue": (22, 0.001),
+    "PowerAdjCoff3": (41, 1),
+    "PowerOnOff": (47, 1),  # 0x1037, see set_inverter_power.py
+    "PVInputMode": (56, 1),
+}
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def load_settings(path: str) -> Dict[int, int]:
+    """Load a settings profile and return the desired raw value per block offset.
+
+    Keys are names from SETTINGS_REGISTERS (scaled values) or register
+    addresses like "0x1037" (raw values).
+    """
+    with open(path) as f:
+        settings = json.load(f)
+
+    desired = {}
+    for key, value in settings.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f"Value {value!r} for {key} is not a number")
+        if key in SETTINGS_REGISTERS:
+            offset, scale = SETTINGS_REGISTERS[key]
+            raw = round(value / scale)
+        else:
+            try:
+                offset = int(key, 0) - ADDRESS
+            except ValueError:
+                raise ValueError(f"Unknown setting {key!r}, use one of {', '.join(SETTINGS_REGISTERS)} or a register address like \"0x1037\"") from None
+            if not 0 <= offset < COUNT:
+                raise ValueError(f"Register {key} is outside the settings block {ADDRESS:#06x}-{ADDRESS + COUNT - 1:#06x}")
+            if value != int(value):
+                raise ValueError(f"Raw value {value} for register {key} is not an integer")
+            raw = int(value)
+        if not -0x8000 <= raw <= 0xFFFF:
+            raise ValueError(f"Value {value} for {key} does not fit in a register")
+        desired[offset] = raw & 0xFFFF
+    return desired
+
+def plan_writes(current: List[int], desired: Dict[int, int]) -> List[Tuple[int, List[int]]]:
+    """Return the changed registers merged into contiguous (address, values) writes."""
+    writes = []
+    for offset in sorted(desired):
+        if current[offset] == desired[offset]:
+            continue
+        if writes and writes[-1][0] + len(writes[-1][1]) == ADDRESS + offset:
+            writes[-1][1].append(desired[offset])
+        else:
+            writes.append((ADDRESS + offset, [desired[offset]]))
+    return writes
+
+def apply_to_inverter(inverter: str, desired: Dict[int, int], reads: List[Tuple[int, int]], dry_run: bool) -> Dict:
+    """Read, diff, write and verify the settings of one inverter.
+
+    Never raises: every failure is reported in the result with status "failed".
+    """
+    result = {"inverter": inverter, "status": "failed", "writes": []}
+    host, port = parse_inverter(inverter)
+
+    client = ModbusTcpClient(host=host, port=port, timeout=3)
+    try:
+        if not client.connect():
+            result["error"] = f"Failed to connect to {inverter}"
+            logging.error(result["error"])
+            return result
+
+        current = read_block(client, reads)
+        if current is None:
+            result["error"] = "Failed to read settings"
+            return result
+
+        writes = plan_writes(current, desired)
+        result["writes"] = [[hex(address), values] for address, values in writes]
+        if not writes:
+            result["status"] = "unchanged"
+            return result
+        if dry_run:
+            result["status"] = "planned"
+            return result
+
+        for address, values in writes:
+            response = client.write_registers(address=address, values=values, slave=SLAVE_ID)
+            if response.isError():
+                result["error"] = f"Write of {len(values)} registers at {address:#06x} failed: {response}"
+                logging.error(f'{inverter}: {result["error"]}')
+                return result
+
+        verify = read_block(client, reads)
+        if verify is None:
+            result["error"] = "Failed to read back settings, writes were sent but not verified"
+            return result
+        mismatches = [hex(ADDRESS + offset) for offset, raw in desired.items() if verify[offset] != raw]
+        if mismatches:
+            result["error"] = f'Registers {", ".join(mismatches)} did not take the new value'
+            logging.error(f'{inverter}: {result["error"]}')
+            result["status"] = "mismatch"
+        else:
+            result["status"] = "applied"
+    except ModbusException as ex:
+        result["error"] = f"{type(ex).__name__}: {ex}"
+        logging.error(f'{inverter}: {result["error"]}')
+    except Exception as ex:
+        # Report any other failure for this inverter too instead of aborting the fleet run
+        result["error"] = f"{type(ex).__name__}: {ex}"
+        logging.exception(f'{inverter}: unexpected error')
+    finally:
+        client.close()
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Apply a settings profile to many SAJ inverters, writing only the registers that differ.",
+        epilog=f"Profile keys: {', '.join(SETTINGS_REGISTERS)} (scaled) or register addresses like \"0x1037\" (raw)."
+    )
+    parser.add_argument('--settings', help="JSON settings profile", type=str, required=True)
+    parser.add_argument('--inverter', help="Inverter as HOST:PORT, repeat for more inverters", type=str, action='append', default=[])
+    parser.add_argument('--inverters', help="File with one HOST:PORT per line", type=str)
+    parser.add_argument('--profile', help="Device profile from discover_inverter_registers.py, used for all inverters", type=str)
+    parser.add_argument('--workers', help="Number of inverters handled in parallel", type=int, default=32)
+    parser.add_argument('--dry-run', help="Only read and print the planned writes", action='store_true')
+    args = parser.parse_args()
+
+    inverters = list(args.inverter)
+    if args.inverters:
+        with open(args.inverters) as f:
+            inverters.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    if not inverters:
+        parser.error("no inverters given, use --inverter or --inverters")
+    invalid = [inverter for inverter in inverters if parse_inverter(inverter) is None]
+    if invalid:
+        parser.error(f"invalid inverter address(es), expected HOST:PORT: {', '.join(invalid)}")
+
+    try:
+        desired = load_settings(args.settings)
+        reads = profile_reads(args.profile, "settings")
+    except ValueError as ex:
+        parser.error(str(ex))
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        results = executor.map(lambda inverter: apply_to_inverter(inverter, desired, reads, args.dry_run), inverters)
+        for result in results:
+            print(json.dumps(result), flush=True)
+
+if __name__ == "__main__":
+    main()
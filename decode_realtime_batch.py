@@ -0,0 +1,160 @@
+import argparse
+import json
+import logging
+import numpy as np
+
+from read_r5_inverter_realtime_data import DEVICE_STATUSSES
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+COUNT = 60  # Registers per realtime block
+
+# Realtime fields as in read_r5_inverter_realtime_data.parse_registers:
+# name -> (register index, "u16" | "s16" | "u32" (index is the high word), scale, decimals)
+FIELDS = {
+    "mpvmode": (0, "u16", 1, None),
+    "pv1volt": (7, "u16", 0.1, 1),
+    "pv1curr": (8, "u16", 0.01, 2),
+    "pv1power": (9, "u16", 1, 0),
+    "pv2volt": (10, "u16", 0.1, 1),
+    "pv2curr": (11, "u16", 0.01, 2),
+    "pv2power": (12, "u16", 1, 0),
+    "pv3volt": (13, "u16", 0.1, 1),
+    "pv3curr": (14, "u16", 0.01, 2),
+    "pv3power": (15, "u16", 1, 0),
+    "busvolt": (16, "u16", 0.1, 1),
+    "invtempc": (17, "u16", 0.1, 1),
+    "gfci": (18, "s16", 1, None),
+    "power": (19, "u16", 1, None),
+    "qpower": (20, "s16", 1, None),
+    "pf": (21, "s16", 0.001, 3),
+    "l1volt": (22, "u16", 0.1, 1),
+    "l1curr": (23, "u16", 0.01, 2),
+    "l1freq": (24, "u16", 0.01, 2),
+    "l1dci": (25, "s16", 1, None),
+    "l1power": (26, "u16", 1, None),
+    "l1pf": (27, "s16", 0.001, 3),
+    "l2volt": (28, "u16", 0.1, 1),
+    "l2curr": (29, "u16", 0.01, 2),
+    "l2freq": (30, "u16", 0.01, 2),
+    "l2dci": (31, "s16", 1, None),
+    "l2power": (32, "u16", 1, None),
+    "l2pf": (33, "s16", 0.001, 3),
+    "l3volt": (34, "u16", 0.1, 1),
+    "l3curr": (35, "u16", 0.01, 2),
+    "l3freq": (36, "u16", 0.01, 2),
+    "l3dci": (37, "s16", 1, None),
+    "l3power": (38, "u16", 1, None),
+    "l3pf": (39, "s16", 0.001, 3),
+    "iso1": (40, "u16", 1, None),
+    "iso2": (41, "u16", 1, None),
+    "iso3": (42, "u16", 1, None),
+    "iso4": (43, "u16", 1, None),
+    "todayenergy": (44, "u16", 0.01, 2),
+    "monthenergy": (45, "u32", 0.01, 2),
+    "yearenergy": (47, "u32", 0.01, 2),
+    "totalenergy": (49, "u32", 0.01, 2),
+    "todayhour": (51, "u16", 0.1, 1),
+    "totalhour": (52, "u32", 0.1, 1),
+    "errorcount": (54, "u16", 1, None),
+}
+
+STATUS_NAMES = np.array([DEVICE_STATUSSES.get(i, "Unknown") for i in range(max(DEVICE_STATUSSES) + 2)])
+
+def field_dtype(kind: str, scale: float) -> str:
+    if scale != 1:
+        return "f8"
+    return {"u16": "u2", "s16": "i2", "u32": "u4"}[kind]
+
+DTYPE = np.dtype(
+    [(name, field_dtype(kind, scale)) for name, (_, kind, scale, _) in FIELDS.items()]
+    + [("mpvstatus", STATUS_NAMES.dtype), ("datetime", "M8[s]")]
+)
+
+def parse_datetime_batch(registers: np.ndarray) -> np.ndarray:
+    """Join the packed date/time registers (4 columns from yyyy) into datetime64, NaT if invalid.
+
+    Years outside 1000-9999 (e.g. an unset 0xFFFF clock) are NaT as well.
+    parse_registers differs there: it joins the fields into a string for
+    strptime, which rejects some of these years and misreads others as a
+    different date.
+    """
+    year = registers[:, 0].astype(np.int64)
+    month = (registers[:, 1] >> 8).astype(np.int64)
+    day = (registers[:, 1] & 0xFF).astype(np.int64)
+    hour = (registers[:, 2] >> 8).astype(np.int64)
+    minute = (registers[:, 2] & 0xFF).astype(np.int64)
+    second = (registers[:, 3] >> 8).astype(np.int64)
+
+    months = (year - 1970) * 12 + month - 1
+    first = months.astype("M8[M]").astype("M8[D]")
+    dates = first + (day - 1).astype("m8[D]")
+    result = dates.astype("M8[s]") + (hour * 3600 + minute * 60 + second).astype("m8[s]")
+
+    # Anything strptime would reject, including days that roll into the next month
+    valid = (
+        (year >= 1000) & (year <= 9999) & (month >= 1) & (month <= 12) & (day >= 1) & (dates.astype("M8[M]") == first.astype("M8[M]"))
+        & (hour <= 23) & (minute <= 59) & (second <= 59)
+    )
+    result[~valid] = np.datetime64("NaT")
+    return result
+
+def parse_registers_batch(registers) -> np.ndarray:
+    """Decode an N x 60 array of raw realtime registers into a structured array.
+
+    Numeric fields give the same values as parse_registers, one record per
+    block. "datetime" is a datetime64, NaT where the packed date/time is not
+    a valid date in the years 1000-9999 (see parse_datetime_batch).
+    """
+    registers = np.asarray(registers, dtype=np.uint16)
+    if registers.ndim != 2 or registers.shape[1] < COUNT:
+        raise ValueError(f"Expected an N x {COUNT} register array, got shape {registers.shape}")
+
+    result = np.empty(len(registers), dtype=DTYPE)
+    for name, (index, kind, scale, decimals) in FIELDS.items():
+        if kind == "u32":
+            values = registers[:, index].astype(np.uint32) << 16 | registers[:, index + 1]
+        elif kind == "s16":
+            values = registers[:, index].view(np.int16)
+        else:
+            values = registers[:, index]
+        if scale != 1:
+            values = values * scale
+        if decimals is not None:
+            values = np.round(values, decimals)
+        result[name] = values
+
+    result["mpvstatus"] = STATUS_NAMES[np.minimum(registers[:, 0], len(STATUS_NAMES) - 1)]
+    result["datetime"] = parse_datetime_batch(registers[:, 55:59])
+    return result
+
+def to_columns(decoded: np.ndarray) -> dict:
+    """Return the structured array as a dict of column arrays."""
+    return {name: decoded[name] for name in decoded.dtype.names}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Decode archived realtime register blocks in bulk.",
+        epilog="Input has one JSON list of 60 registers per line. Output is .npy (structured array) or .csv."
+    )
+    parser.add_argument('--input', help="File with one realtime block per line", type=str, required=True)
+    parser.add_argument('--output', help="Output file, .npy or .csv", type=str, required=True)
+    args = parser.parse_args()
+
+    with open(args.input) as f:
+        registers = np.array([json.loads(line)[:COUNT] for line in f if line.strip()], dtype=np.uint16)
+
+    decoded = parse_registers_batch(registers)
+    if args.output.endswith(".csv"):
+        with open(args.output, "w") as f:
+            f.write(",".join(decoded.dtype.names) + "\n")
+            for row in decoded.tolist():
+                # NaT comes out of tolist() as None, write an empty field
+                f.write(",".join("" if value is None else str(value) for value in row) + "\n")
+    else:
+        np.save(args.output, decoded)
+    logging.info(f'Decoded {len(decoded)} blocks to {args.output}')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import argparse
+import json
+import logging
+import os
+from pymodbus.client import ModbusTcpClient
+from pymodbus.exceptions import ModbusException
+from typing import Dict, List, Optional, Tuple
+
+from saj_profile import BLOCKS
+
+# Constants
+MAX_READ = 125  # Modbus limit for a single read_holding_registers request
+RETRIES = 2  # Extra attempts for a probe that times out or loses the connection
+PROFILE_DIR = "profiles"
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class Prober:
+    """Issue probe reads against one inverter and count them.
+
+    Only exception responses mean a read is too long; timeouts and transport
+    errors are retried and abort discovery when they persist, so they never
+    shrink the profile.
+    """
+
+    def __init__(self, client: ModbusTcpClient, slave: int = 1):
+        self.client = client
+        self.slave = slave
+        self.reads = 0
+
+    def read(self, address: int, count: int) -> Optional[List[int]]:
+        for attempt in range(RETRIES + 1):
+            self.reads += 1
+            try:
+                result = self.client.read_holding_registers(slave=self.slave, address=address, count=count)
+                break
+            except ModbusException as ex:
+                if attempt == RETRIES:
+                    raise
+                logging.warning(f'Probe {address:#06x}+{count} failed, retrying: {ex}')
+                # Resync on a fresh connection
+                self.client.close()
+                self.client.connect()
+        if result.isError():
+            logging.debug(f'Probe {address:#06x}+{count}: exception response {result}')
+            return None
+        return result.registers
+
+    def can_read(self, address: int, count: int) -> bool:
+        return self.read(address, count) is not None
+
+def largest_read(prober: Prober, address: int, limit: int, hint: Optional[int] = None) -> int:
+    """Bisect the largest count <= limit that can be read at address, 0 if none.
+
+    Assumes a read of n registers failing means every longer read fails too.
+    A hint (e.g. the size the previous chunk settled on) is tried first.
+    """
+    if prober.can_read(address, limit):
+        return limit
+    good, bad = 0, limit
+    if hint is not None and 0 < hint < limit:
+        if prober.can_read(address, hint):
+            good = hint
+        else:
+            bad = hint
+    while bad - good > 1:
+        mid = (good + bad) // 2
+        if prober.can_read(address, mid):
+            good = mid
+        else:
+            bad = mid
+    return good
+
+def plan_block(prober: Prober, address: int, count: int) -> List[Tuple[int, int]]:
+    """Cover count registers from address with the fewest, largest valid reads.
+
+    Stops early at the first register that cannot be read at all.
+    """
+    reads = []
+    end = address + count
+    n = None
+    while address < end:
+        n = largest_read(prober, address, min(MAX_READ, end - address), hint=n)
+        if n == 0:
+            break
+        reads.append((address, n))
+        address += n
+    return reads
+
+def discover(client: ModbusTcpClient) -> Dict:
+    """Probe every known block and return the device profile."""
+    prober = Prober(client)
+
+    model = "unknown"
+    details_address = BLOCKS["details"][0]
+    registers = prober.read(details_address, 2)
+    if registers is not None:
+        model = f"{registers[0]}_{registers[1]}"
+
+    blocks = {}
+    for name, (address, count) in BLOCKS.items():
+        reads = plan_block(prober, address, count)
+        readable = sum(n for _, n in reads)
+        if readable < count:
+            logging.warning(f'{name}: only {readable} of {count} registers readable at {address:#06x}')
+        logging.info(f'{name}: {readable} registers in {len(reads)} read(s)')
+        blocks[name] = {
+            "address": address,
+            "count": readable,
+            "reads": reads,
+        }
+
+    logging.info(f'Discovery finished after {prober.reads} probe reads')
+    return {"model": model, "blocks": blocks}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Probe the readable register ranges of a SAJ inverter and save a device profile."
+    )
+    parser.add_argument('--host', help="SAJ Inverter IP", type=str, required=True)
+    parser.add_argument('--port', help="SAJ Inverter Port", type=int, required=True)
+    parser.add_argument('--output', help=f"Profile file, default {PROFILE_DIR}/saj_<devicetype>_<subtype>.json", type=str)
+    args = parser.parse_args()
+
+    client = ModbusTcpClient(host=args.host, port=args.port, timeout=3)
+    if not client.connect():
+        logging.error(f'Failed to connect to {args.host}:{args.port}')
+        return
+
+    try:
+        profile = discover(client)
+    except ModbusException as ex:
+        logging.error(f'Discovery aborted, no profile written: {ex}')
+        return
+    finally:
+        client.close()
+
+    path = args.output or os.path.join(PROFILE_DIR, f"saj_{profile['model']}.json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(profile, f, indent=4)
+    logging.info(f'Profile written to {path}')
+    print(json.dumps(profile))
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
 import argparse
+import json
 import logging
+import time
+from datetime import datetime
 from pymodbus.client import ModbusTcpClient
-from pymodbus.exceptions import ConnectionException
+from typing import Optional
+
+from read_r5_inverter_realtime_data import DEVICE_STATUSSES, IDLE_STATUSSES
+from saj_profile import BLOCKS, profile_reads, read_block
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -94,23 +100,14 @@ FAULT_MESSAGES = {
     },
 }
 
-def read_inverter_errors(client: ModbusTcpClient, address: int, count: int) -> list:
-    """Read inverter error registers and return the fault messages."""
-    try:
-        inverter_data = client.read_holding_registers(slave=1, address=address, count=count)
-        if inverter_data.isError():
-            raise ConnectionException("Error reading registers")
-    except ConnectionException as ex:
-        logging.error(f'Connecting to device failed: {ex}')
-        return []
-    return inverter_data.registers
+def fault_words(registers: list[int]) -> list[int]:
+    """Join the six fault registers into three 32-bit fault words."""
+    return [registers[i] << 16 | registers[i + 1] for i in range(0, 6, 2)]
 
 def parse_fault_messages(registers: list[int]) -> str:
     """Parse the fault messages from the registers."""
     faultMsg = []
-    faultMsg0 = registers[0] << 16 | registers[1]
-    faultMsg1 = registers[2] << 16 | registers[3]
-    faultMsg2 = registers[4] << 16 | registers[5]
+    faultMsg0, faultMsg1, faultMsg2 = fault_words(registers)
 
     logging.info(f"faultMsg {faultMsg0:#010x} {faultMsg1:#010x} {faultMsg2:#010x}")
 
@@ -122,18 +119,107 @@ def parse_fault_messages(registers: list[int]) -> str:
 
     return ", ".join(faultMsg)
 
+def decode_fault_bits(index: int, bits: int) -> list[str]:
+    """Decode only the given bits of fault word index into messages."""
+    messages = []
+    while bits:
+        bit = bits & -bits
+        messages.append(FAULT_MESSAGES[index].get(bit, f"Unknown fault word {index} bit {bit:#010x}"))
+        bits ^= bit
+    return messages
+
+def diff_faults(previous: list[int], current: list[int]) -> list[tuple[str, str]]:
+    """Return (event, message) pairs for the fault bits raised or cleared since previous."""
+    events = []
+    for i, (old, new) in enumerate(zip(previous, current)):
+        changed = old ^ new
+        if changed:
+            events.extend(("raise", mesg) for mesg in decode_fault_bits(i, changed & new))
+            events.extend(("clear", mesg) for mesg in decode_fault_bits(i, changed & old))
+    return events
+
+def read_status(client: ModbusTcpClient) -> Optional[int]:
+    """Read only the realtime status register, None if it cannot be read."""
+    registers = read_block(client, [(BLOCKS["realtime"][0], 1)])
+    if not registers:
+        # Reconnect, a timed out connection may be out of sync
+        client.close()
+        client.connect()
+        return None
+    return registers[0]
+
+def watch_faults(client: ModbusTcpClient, reads: list[tuple[int, int]], interval: float, idle_interval: float) -> None:
+    """Poll the fault words and print a timestamped JSON line per raised or cleared fault.
+
+    The status register is checked every idle_interval. While the inverter is
+    Not Connected, Waiting or unreachable (e.g. at night) only that status
+    probe runs; fault polling resumes when the status is Normal or Error.
+    """
+    previous = [0, 0, 0]
+    idle = False
+    status_at = None
+    next_poll = time.monotonic()
+    while True:
+        if status_at is None or time.monotonic() - status_at >= idle_interval:
+            status = read_status(client)
+            status_at = time.monotonic()
+            if (status is None or status in IDLE_STATUSSES) != idle:
+                idle = not idle
+                logging.info(f'{DEVICE_STATUSSES.get(status, "Unreachable")}, {"pausing" if idle else "resuming"} fault polling')
+
+        if not idle:
+            registers = read_block(client, reads)
+            if registers:
+                current = fault_words(registers)
+                timestamp = datetime.now().astimezone().isoformat(timespec='milliseconds')
+                for event, mesg in diff_faults(previous, current):
+                    print(json.dumps({"datetime": timestamp, "event": event, "faultmessage": mesg}), flush=True)
+                previous = current
+            else:
+                # Keep the last known state so a failed read does not look like a clear
+                logging.error("Failed to read inverter errors, checking status")
+                # Reconnect, a timed out connection may be out of sync
+                client.close()
+                client.connect()
+                status_at = None
+
+        now = time.monotonic()
+        if idle:
+            next_poll = status_at + idle_interval
+        elif status_at is None:
+            next_poll = now
+        else:
+            next_poll += interval
+        if next_poll < now:
+            # Fell behind (e.g. a timeout), skip the missed polls instead of bursting
+            next_poll = now
+        time.sleep(next_poll - now)
+
 def main() -> None:
     """Main function to read and display inverter error messages."""
     parser = argparse.ArgumentParser()
     parser.add_argument('--host', help="SAJ Inverter IP", type=str, required=True)
     parser.add_argument('--port', help="SAJ Inverter Port", type=int, required=True)
+    parser.add_argument('--profile', help="Device profile from discover_inverter_registers.py", type=str)
+    parser.add_argument('--watch', help="Keep polling and print fault raise/clear events", action='store_true')
+    parser.add_argument('--interval', help="Watch poll interval in seconds", type=float, default=0.5)
+    parser.add_argument('--idle-interval', help="Watch status probe interval in seconds, also used while the inverter is waiting or asleep", type=float, default=60.0)
     args = parser.parse_args()
 
+    try:
+        reads = profile_reads(args.profile, "errors")
+    except ValueError as ex:
+        parser.error(str(ex))
+
     client = ModbusTcpClient(host=args.host, port=args.port, timeout=3)
     client.connect()
 
     try:
-        registers = read_inverter_errors(client, address=0x0101, count=6)
+        if args.watch:
+            watch_faults(client, reads, args.interval, args.idle_interval)
+            return
+
+        registers = read_block(client, reads)
         if registers:
             error = parse_fault_messages(registers)
             if error:
@@ -144,6 +230,8 @@ def main() -> None:
                 print("No faults")
         else:
             logging.error("Failed to read inverter errors")
+    except KeyboardInterrupt:
+        pass
     finally:
         client.close()
 
@@ -2,26 +2,13 @@ import argparse
 import json
 import logging
 from pymodbus.client import ModbusTcpClient
-from pymodbus.exceptions import ConnectionException
-from typing import List, Optional, Dict
+from typing import List, Dict
 
-# Constants
-ADDRESS = 0x8F00  # First register with Inverter details
-COUNT = 29  # Number of registers to read
+from saj_profile import profile_reads, read_block
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def read_inverter_data(client: ModbusTcpClient, address: int, count: int) -> Optional[List[int]]:
-    try:
-        inverter_data = client.read_holding_registers(slave=1, address=address, count=count)
-        if inverter_data.isError():
-            raise ConnectionException("Error reading registers")
-        return inverter_data.registers
-    except ConnectionException as ex:
-        logging.error(f'Connecting to device failed: {ex}')
-        return None
-
 def parse_registers(registers: List[int]) -> Dict[str, str]:
     def parse_string(registers_slice: List[int]) -> str:
         return ''.join(chr(registers_slice[i] >> 8) + chr(registers_slice[i] & 0xFF) for i in range(len(registers_slice))).rstrip('\x00')
@@ -44,14 +31,20 @@ def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument('--host', help="SAJ Inverter IP", type=str, required=True)
     parser.add_argument('--port', help="SAJ Inverter Port", type=int, required=True)
+    parser.add_argument('--profile', help="Device profile from discover_inverter_registers.py", type=str)
     args = parser.parse_args()
 
+    try:
+        reads = profile_reads(args.profile, "details")
+    except ValueError as ex:
+        parser.error(str(ex))
+
     client = ModbusTcpClient(host=args.host, port=args.port, timeout=3)
     if not client.connect():
         logging.error(f'Failed to connect to {args.host}:{args.port}')
         return
 
-    registers = read_inverter_data(client, ADDRESS, COUNT)
+    registers = read_block(client, reads)
     client.close()
 
     if registers is not None:
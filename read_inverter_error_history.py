@@ -1,10 +1,11 @@
 import argparse
 import logging
 from pymodbus.client import ModbusTcpClient
-from pymodbus.exceptions import ConnectionException
 from datetime import datetime
 import json
 
+from saj_profile import profile_reads, read_block
+
 # Configure logging
 logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -96,17 +97,6 @@ FAULT_MESSAGES = {
     },
 }
 
-def read_inverter_registers(client: ModbusTcpClient, address: int, count: int) -> list:
-    """Read inverter error registers and return the fault messages."""
-    try:
-        inverter_data = client.read_holding_registers(slave=1, address=address, count=count)
-        if inverter_data.isError():
-            raise ConnectionException("Error reading registers")
-    except ConnectionException as ex:
-        logging.error(f'Connecting to device failed: {ex}')
-        return []
-    return inverter_data.registers
-
 def parse_fault_messages(registers: list[int]) -> str:
     """Parse the fault messages from the registers."""
     faultMsg = []
@@ -140,53 +130,66 @@ def parse_datetime (registers: list[int]) -> str:
     readable_date_time = str(date_time_obj.strftime('%Y-%m-%d %H:%M:%S'))
     return(readable_date_time)
 
+def parse_error_history(allregisters: list[int]) -> list[dict]:
+    """Split the history registers into 10-register entries and parse each one."""
+    history = []
+    # Skip a trailing partial entry when the profile ends mid-entry
+    sub_arrays = [allregisters[i:i+10] for i in range(0, len(allregisters) - 9, 10)]
+    for index, sub_array in enumerate(sub_arrays):
+        errornumber = index + 1
+
+        if sub_array[0] == 65535:
+            logging.info("No more error data")
+        else:
+            timeregisters = sub_array[0:4]
+            if timeregisters:
+                datetime = parse_datetime(timeregisters)
+                if datetime:
+                    logging.info(f"Fault datetime: {datetime}")
+                else:
+                    logging.info("No datetime")
+            else:
+                logging.error("Failed to read inverter error time")
+            
+            errorregisters = sub_array[4:10]
+            if errorregisters:
+                errormsg = parse_fault_messages(errorregisters)
+                if errormsg:
+                    logging.info(f"Fault message: {errormsg}")
+                else:
+                    logging.info("No faults")
+            else:
+                logging.error("Failed to read inverter error details")
+                
+            data = {
+                "error": errornumber,
+                "datetime": datetime,
+                "faultmessage": errormsg
+            }
+            history.append(data)
+    return history
+
 def main() -> None:
     """Main function to read and display inverter error messages."""
     parser = argparse.ArgumentParser()
     parser.add_argument('--host', help="SAJ Inverter IP", type=str, required=True)
     parser.add_argument('--port', help="SAJ Inverter Port", type=int, required=True)
+    parser.add_argument('--profile', help="Device profile from discover_inverter_registers.py", type=str)
     args = parser.parse_args()
 
+    try:
+        reads = profile_reads(args.profile, "history")
+    except ValueError as ex:
+        parser.error(str(ex))
+
     client = ModbusTcpClient(host=args.host, port=args.port, timeout=3)
     client.connect()
     
     try:
-        allregisters = read_inverter_registers(client, address=0xB00, count=100)
-        sub_arrays = [allregisters[i:i+10] for i in range(0, len(allregisters), 10)]
-        for index, sub_array in enumerate(sub_arrays):
-            errornumber = index + 1
-
-            if sub_array[0] == 65535:
-                logging.info("No more error data")
-            else:
-                timeregisters = sub_array[0:4]
-                if timeregisters:
-                    datetime = parse_datetime(timeregisters)
-                    if datetime:
-                        logging.info(f"Fault datetime: {datetime}")
-                    else:
-                        logging.info("No datetime")
-                else:
-                    logging.error("Failed to read inverter error time")
-                
-                errorregisters = sub_array[4:10]
-                if errorregisters:
-                    errormsg = parse_fault_messages(errorregisters)
-                    if errormsg:
-                        logging.info(f"Fault message: {errormsg}")
-                    else:
-                        logging.info("No faults")
-                else:
-                    logging.error("Failed to read inverter error details")
-                    
-                data = {
-                    "error": errornumber,
-                    "datetime": datetime,
-                    "faultmessage": errormsg
-                }
-                
-                json_data = json.dumps(data)
-                print(json_data)
+        allregisters = read_block(client, reads) or []
+        for data in parse_error_history(allregisters):
+            json_data = json.dumps(data)
+            print(json_data)
     finally:
         client.close()
 
@@ -2,12 +2,9 @@ import argparse
 import json
 import logging
 from pymodbus.client import ModbusTcpClient
-from pymodbus.exceptions import ConnectionException
-from typing import List, Optional, Dict
+from typing import List, Dict
 
-# Constants
-ADDRESS = 0x1008  # First register with Inverter details
-COUNT = 64  # Number of registers to read
+from saj_profile import profile_reads, read_block
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -19,16 +16,6 @@ def convert_to_signed(value):
     else:
         return value
         
-def read_inverter_data(client: ModbusTcpClient, address: int, count: int) -> Optional[List[int]]:
-    try:
-        inverter_data = client.read_holding_registers(slave=1, address=address, count=count)
-        if inverter_data.isError():
-            raise ConnectionException("Error reading registers")
-        return inverter_data.registers
-    except ConnectionException as ex:
-        logging.error(f'Connecting to device failed: {ex}')
-        return None
-
 def parse_registers(registers: List[int]) -> Dict[str, str]:
 
     return {
@@ -46,14 +33,20 @@ def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument('--host', help="SAJ Inverter IP", type=str, required=True)
     parser.add_argument('--port', help="SAJ Inverter Port", type=int, required=True)
+    parser.add_argument('--profile', help="Device profile from discover_inverter_registers.py", type=str)
     args = parser.parse_args()
 
+    try:
+        reads = profile_reads(args.profile, "settings")
+    except ValueError as ex:
+        parser.error(str(ex))
+
     client = ModbusTcpClient(host=args.host, port=args.port, timeout=3)
     if not client.connect():
         logging.error(f'Failed to connect to {args.host}:{args.port}')
         return
 
-    registers = read_inverter_data(client, ADDRESS, COUNT)
+    registers = read_block(client, reads)
     client.close()
 
     if registers is not None:
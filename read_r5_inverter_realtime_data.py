@@ -2,9 +2,10 @@ import argparse
 import json
 import logging
 from pymodbus.client import ModbusTcpClient
-from pymodbus.exceptions import ConnectionException
 from datetime import datetime
 
+from saj_profile import profile_reads, read_block
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -16,6 +17,9 @@ DEVICE_STATUSSES = {
     4: "Upgrading",
 }
 
+# Statuses in which the inverter is asleep or not producing
+IDLE_STATUSSES = {0, 1}
+
 def parse_datetime (registers: list[int]) -> str:
     """Extract date and time values from registers."""
 
@@ -35,16 +39,6 @@ def parse_datetime (registers: list[int]) -> str:
     readable_date_time = str(date_time_obj.strftime('%Y-%m-%d %H:%M:%S'))
     return(readable_date_time)
     
-def read_modbus_data(client, address, count):
-    try:
-        result = client.read_holding_registers(slave=1, address=address, count=count)
-        if result.isError():
-            raise ConnectionException("Error reading registers")
-        return result.registers
-    except ConnectionException as ex:
-        logging.error(f'Error reading registers: {ex}')
-        return None
-        
 def convert_to_signed(value):
     """Convert unsigned integers to signed integers."""
     if value >= 0x8000:
@@ -108,17 +102,20 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--host', help="SAJ Inverter IP", type=str, required=True)
     parser.add_argument('--port', help="SAJ Inverter Port", type=int, required=True)
+    parser.add_argument('--profile', help="Device profile from discover_inverter_registers.py", type=str)
     args = parser.parse_args()
 
-    address = 0x100  # First register with Realtime data.
-    count = 60  # Read this amount of registers
+    try:
+        reads = profile_reads(args.profile, "realtime")
+    except ValueError as ex:
+        parser.error(str(ex))
 
     client = ModbusTcpClient(host=args.host, port=args.port, timeout=3)
     if not client.connect():
         logging.error(f'Failed to connect to {args.host}:{args.port}')
         return
 
-    registers = read_modbus_data(client, address, count)
+    registers = read_block(client, reads)
     client.close()
 
     if registers:
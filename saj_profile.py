@@ -0,0 +1,73 @@
+import json
+import logging
+from pymodbus.client import ModbusTcpClient
+from pymodbus.exceptions import ConnectionException, ModbusException
+from typing import Dict, List, Optional, Tuple
+
+# Register blocks used by the read scripts: name -> (first register, number of registers)
+BLOCKS = {
+    "realtime": (0x100, 60),
+    "errors": (0x101, 6),
+    "history": (0xB00, 100),
+    "settings": (0x1008, 64),
+    "details": (0x8F00, 29),
+}
+
+# Fewest registers a profile must cover for blocks whose parser handles less than
+# the full block; history needs at least one whole 10-register entry
+MIN_COUNTS = {"history": 10}
+
+def load_profile(path: str) -> Dict:
+    """Load a device profile written by discover_inverter_registers.py.
+
+    Raises ValueError when the file cannot be read or is not valid JSON.
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except OSError as ex:
+        raise ValueError(f"Cannot read profile {path}: {ex.strerror}") from ex
+    except json.JSONDecodeError as ex:
+        raise ValueError(f"Profile {path} is not valid JSON: {ex}") from ex
+
+def block_reads(profile: Optional[Dict], name: str) -> List[Tuple[int, int]]:
+    """Return the (address, count) reads for a block, from the profile if it has one.
+
+    Raises ValueError when the profile covers fewer registers than the block's parser needs.
+    """
+    address, count = BLOCKS[name]
+    if profile is None or name not in profile.get("blocks", {}):
+        return [(address, count)]
+    block = profile["blocks"][name]
+    needed = MIN_COUNTS.get(name, count)
+    if block["count"] < needed:
+        raise ValueError(
+            f'Profile for model {profile.get("model", "unknown")} covers only {block["count"]} of the '
+            f'{needed} {name} registers needed at {address:#06x}, this device cannot be read with the {name} parser'
+        )
+    return [(addr, cnt) for addr, cnt in block["reads"]]
+
+def profile_reads(path: Optional[str], name: str) -> List[Tuple[int, int]]:
+    """Load the profile at path (if any) and return the reads for a block."""
+    return block_reads(load_profile(path) if path else None, name)
+
+def parse_inverter(inverter: str) -> Optional[Tuple[str, int]]:
+    """Split HOST:PORT, None if it is not a valid inverter address."""
+    host, _, port = inverter.rpartition(":")
+    if not host or not port.isdigit() or not 0 < int(port) < 65536:
+        return None
+    return host, int(port)
+
+def read_block(client: ModbusTcpClient, reads: List[Tuple[int, int]], slave: int = 1) -> Optional[List[int]]:
+    """Execute the reads in order and return the joined registers, or None on failure."""
+    registers = []
+    for address, count in reads:
+        try:
+            result = client.read_holding_registers(slave=slave, address=address, count=count)
+            if result.isError():
+                raise ConnectionException(f"Error reading {count} registers at {address:#06x}")
+        except ModbusException as ex:
+            logging.error(f'Error reading registers: {ex}')
+            return None
+        registers.extend(result.registers)
+    return registers
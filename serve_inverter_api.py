@@ -0,0 +1,295 @@
+import argparse
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pymodbus.client import ModbusTcpClient
+from pymodbus.exceptions import ModbusException
+from typing import Callable, Dict, List, Optional, Tuple
+
+import read_inverter_current_error
+import read_inverter_details
+import read_inverter_error_history
+import read_inverter_settings
+import read_r5_inverter_realtime_data
+from saj_profile import BLOCKS, block_reads, load_profile, parse_inverter, read_block
+
+# Configure logging (force: the imported read scripts configure logging on import too)
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', force=True)
+
+# Seconds a cached block is served before it is read again
+DEFAULT_TTLS = {
+    "realtime": 5.0,
+    "errors": 2.0,
+    "history": 60.0,
+    "settings": 60.0,
+    "details": 3600.0,
+}
+
+# Blocks that are not read while the inverter is idle; a 1-register status probe is done instead
+DUTY_CYCLED = {"realtime", "errors", "history"}
+DEFAULT_IDLE_INTERVAL = 60.0
+
+PARSERS: Dict[str, Callable] = {
+    "realtime": read_r5_inverter_realtime_data.parse_registers,
+    "errors": lambda registers: {"faultmessage": read_inverter_current_error.parse_fault_messages(registers)},
+    "history": read_inverter_error_history.parse_error_history,
+    "settings": read_inverter_settings.parse_registers,
+    "details": read_inverter_details.parse_registers,
+}
+
+class Inverter:
+    """One inverter behind a single, serialized Modbus connection."""
+
+    def __init__(self, name: str, host: str, port: int, profile: Optional[Dict] = None):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.profile = profile
+        self.client = ModbusTcpClient(host=host, port=port, timeout=3)
+        # The sync client is not thread-safe and dongles often allow one connection only
+        self.lock = threading.Lock()
+        # Duty cycling state: last known realtime status and when it was last probed
+        self.status: Optional[int] = None
+        self.idle = False
+        self.probed_at = 0.0
+
+    def read(self, block: str) -> Optional[List[int]]:
+        return self.read_registers(block_reads(self.profile, block))
+
+    def read_status(self) -> Optional[int]:
+        """Read only the realtime status register."""
+        registers = self.read_registers([(BLOCKS["realtime"][0], 1)])
+        return registers[0] if registers else None
+
+    def update_status(self, status: Optional[int]) -> None:
+        """Switch between full-rate and idle polling; an unreachable inverter counts as idle."""
+        idle = status is None or status in read_r5_inverter_realtime_data.IDLE_STATUSSES
+        if idle != self.idle:
+            state = read_r5_inverter_realtime_data.DEVICE_STATUSSES.get(status, "Unreachable")
+            logging.info(f'{self.name}: {state}, switching to {"idle" if idle else "full-rate"} polling')
+        self.status = status
+        self.idle = idle
+        self.probed_at = time.monotonic()
+
+    def read_registers(self, reads: List[Tuple[int, int]]) -> Optional[List[int]]:
+        with self.lock:
+            try:
+                if not self.client.connected and not self.client.connect():
+                    logging.error(f'{self.name}: failed to connect to {self.host}:{self.port}')
+                    return None
+                registers = read_block(self.client, reads)
+            except ModbusException as ex:
+                logging.error(f'{self.name}: read failed: {ex}')
+                registers = None
+            if registers is None:
+                # Start from a fresh connection on the next read
+                self.client.close()
+            return registers
+
+class InverterIdle(Exception):
+    """An idle inverter was asked for a block that has not been read yet."""
+
+    def __init__(self, mode: Optional[int], status: str):
+        super().__init__(status)
+        self.mode = mode
+        self.status = status
+
+class BlockCache:
+    """Serve parsed blocks from cache, with at most one Modbus read in flight per inverter/block."""
+
+    def __init__(self, inverters: Dict[str, Inverter], ttls: Dict[str, float], idle_interval: float = DEFAULT_IDLE_INTERVAL):
+        self.inverters = inverters
+        self.ttls = ttls
+        self.idle_interval = idle_interval
+        self.entries: Dict[Tuple[str, str], Tuple[float, object]] = {}
+        # When the last read of a block failed; the failure is served like a cached entry
+        self.failures: Dict[Tuple[str, str], float] = {}
+        # Created up front so concurrent requests always find the same lock
+        self.locks = {(name, block): threading.Lock() for name in inverters for block in [*PARSERS, "status"]}
+
+    def get(self, name: str, block: str) -> Optional[Tuple[object, float]]:
+        """Return (data, age in seconds) or None when the inverter could not be read.
+
+        Raises InverterIdle for errors or history of an idle inverter that have never been read.
+        """
+        inverter = self.inverters[name]
+        if block in DUTY_CYCLED:
+            idle = self.get_idle(name, block)
+            if idle is not None:
+                return idle
+
+        key = (name, block)
+        if self.failed_recently(key, block):
+            return None
+        entry = self.entries.get(key)
+        if entry and time.monotonic() - entry[0] < self.ttls[block]:
+            return entry[1], time.monotonic() - entry[0]
+
+        # Requests arriving while a read is in flight wait here and reuse its result,
+        # whether it succeeded or failed
+        with self.locks[key]:
+            # The read this request waited on may have put the inverter to idle
+            if block in DUTY_CYCLED:
+                idle = self.get_idle(name, block)
+                if idle is not None:
+                    return idle
+            if self.failed_recently(key, block):
+                return None
+            entry = self.entries.get(key)
+            if entry and time.monotonic() - entry[0] < self.ttls[block]:
+                return entry[1], time.monotonic() - entry[0]
+
+            registers = inverter.read(block)
+            if registers is None:
+                self.failures[key] = time.monotonic()
+                if block in DUTY_CYCLED:
+                    # Likely a sleeping dongle: back off to the idle status probe
+                    inverter.update_status(None)
+                return None
+            if block == "realtime":
+                inverter.update_status(registers[0])
+            try:
+                data = PARSERS[block](registers)
+            except (ValueError, IndexError) as ex:
+                logging.error(f'{name}: failed to parse {block} registers: {ex}')
+                self.failures[key] = time.monotonic()
+                return None
+            self.failures.pop(key, None)
+            self.entries[key] = (time.monotonic(), data)
+            return data, 0.0
+
+    def failed_recently(self, key: Tuple[str, str], block: str) -> bool:
+        failed_at = self.failures.get(key)
+        return failed_at is not None and time.monotonic() - failed_at < self.ttls[block]
+
+    def refresh_status(self, name: str) -> None:
+        """Probe the status register when the known status is older than the idle interval.
+
+        Realtime reads keep the status fresh while the inverter is active; this
+        covers idle inverters and clients that only poll errors or history.
+        """
+        inverter = self.inverters[name]
+        with self.locks[(name, "status")]:
+            if time.monotonic() - inverter.probed_at >= self.idle_interval:
+                inverter.update_status(inverter.read_status())
+
+    def get_idle(self, name: str, block: str) -> Optional[Tuple[object, float]]:
+        """Answer a duty cycled block for an idle inverter, or None while it is active.
+
+        Realtime reports just the status. Errors and history are answered from
+        their last cached read, InverterIdle is raised if there is none.
+        """
+        inverter = self.inverters[name]
+        # Full realtime reads update the status themselves while active
+        if block != "realtime" or inverter.idle:
+            self.refresh_status(name)
+        if not inverter.idle:
+            return None
+
+        status = read_r5_inverter_realtime_data.DEVICE_STATUSSES.get(inverter.status, "Unreachable")
+        if block == "realtime":
+            return {"mpvmode": inverter.status, "mpvstatus": status}, time.monotonic() - inverter.probed_at
+        entry = self.entries.get((name, block))
+        if entry is None:
+            raise InverterIdle(inverter.status, status)
+        return entry[1], time.monotonic() - entry[0]
+
+def make_handler(cache: BlockCache):
+    class Handler(BaseHTTPRequestHandler):
+        def send_json(self, status: int, body: object, age: Optional[float] = None) -> None:
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            if age is not None:
+                self.send_header("Age", str(int(age)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self) -> None:
+            parts = [part for part in self.path.split("?")[0].split("/") if part]
+            if parts == ["inverters"]:
+                self.send_json(200, sorted(cache.inverters))
+                return
+            if len(parts) != 2 or parts[0] not in cache.inverters or parts[1] not in PARSERS:
+                self.send_json(404, {"error": f"Use /inverters or /<inverter>/<{'|'.join(PARSERS)}>"})
+                return
+
+            try:
+                result = cache.get(parts[0], parts[1])
+            except InverterIdle as idle:
+                self.send_json(503, {
+                    "error": f"{parts[0]} is idle and {parts[1]} has not been read yet",
+                    "mpvmode": idle.mode,
+                    "mpvstatus": idle.status,
+                })
+                return
+            if result is None:
+                self.send_json(502, {"error": f"Failed to read {parts[1]} from {parts[0]}"})
+                return
+            data, age = result
+            self.send_json(200, data, age)
+
+        def log_message(self, format: str, *args) -> None:
+            logging.debug(f'{self.address_string()} - {format % args}')
+
+    return Handler
+
+def parse_pair(value: str) -> Tuple[str, str]:
+    name, sep, rest = value.partition("=")
+    if not sep or not name or not rest:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got '{value}'")
+    return name, rest
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve SAJ inverter data as cached HTTP/JSON, sharing one Modbus read per TTL between clients.",
+        epilog="Endpoints: /inverters and /<inverter>/<realtime|errors|history|settings|details>."
+    )
+    parser.add_argument('--inverter', help="Inverter as NAME=HOST:PORT, repeat for more inverters", type=parse_pair, action='append', required=True)
+    parser.add_argument('--profile', help="Device profile as NAME=PATH, from discover_inverter_registers.py", type=parse_pair, action='append', default=[])
+    parser.add_argument('--ttl', help="Cache TTL as BLOCK=SECONDS, e.g. realtime=10", type=parse_pair, action='append', default=[])
+    parser.add_argument('--idle-interval', help="Seconds between status probes while an inverter is waiting or asleep", type=float, default=DEFAULT_IDLE_INTERVAL)
+    parser.add_argument('--listen', help="Address to listen on", type=str, default="127.0.0.1")
+    parser.add_argument('--listen-port', help="HTTP port to listen on", type=int, default=8080)
+    args = parser.parse_args()
+
+    names = {name for name, _ in args.inverter}
+    profiles = {}
+    for name, path in args.profile:
+        if name not in names:
+            parser.error(f"profile for unknown inverter '{name}', choose from {', '.join(sorted(names))}")
+        try:
+            profiles[name] = load_profile(path)
+            for block in PARSERS:
+                block_reads(profiles[name], block)
+        except ValueError as ex:
+            parser.error(f"{name}: {ex}")
+    inverters = {}
+    for name, address in args.inverter:
+        parsed = parse_inverter(address)
+        if parsed is None:
+            parser.error(f"invalid address for inverter '{name}', expected NAME=HOST:PORT, got '{address}'")
+        inverters[name] = Inverter(name, *parsed, profiles.get(name))
+
+    ttls = dict(DEFAULT_TTLS)
+    for block, seconds in args.ttl:
+        if block not in ttls:
+            parser.error(f"unknown block '{block}', choose from {', '.join(ttls)}")
+        ttls[block] = float(seconds)
+
+    server = ThreadingHTTPServer((args.listen, args.listen_port), make_handler(BlockCache(inverters, ttls, args.idle_interval)))
+    logging.info(f'Serving {len(inverters)} inverter(s) on http://{args.listen}:{args.listen_port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        for inverter in inverters.values():
+            inverter.client.close()
+
+if __name__ == "__main__":
+    main()